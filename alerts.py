@@ -1,5 +1,18 @@
+from dataclasses import dataclass
 from datetime import datetime
 
+# One threshold alert; __slots__ keeps it small and orjson serializes it like a dict
+# (declared by hand because dataclass(slots=True) needs Python 3.10+)
+@dataclass
+class Alert:
+    __slots__ = ('type', 'message', 'value', 'threshold', 'timestamp', 'severity')
+    type: str
+    message: str
+    value: float
+    threshold: float
+    timestamp: datetime
+    severity: str
+
 class AlertManager:
     def __init__(self):
         # Set initial alert thresholds for CPU and memory usage
@@ -11,26 +24,10 @@ class AlertManager:
     def check_thresholds(self, cpu_usage, memory_usage, timestamp):
         alerts = []
         if cpu_usage > self.cpu_threshold:
-            alert = {
-                'type': 'CPU',
-                'message': 'High CPU usage: {:.2f}%'.format(cpu_usage),
-                'value': cpu_usage,
-                'threshold': self.cpu_threshold,
-                'timestamp': timestamp,
-                'severity': 'HIGH'
-            }
-            alerts.append(alert)
+            alerts.append(Alert('CPU', f'High CPU usage: {cpu_usage:.2f}%', cpu_usage, self.cpu_threshold, timestamp, 'HIGH'))
 
         if memory_usage > self.memory_threshold:
-            alert = {
-                'type': 'MEMORY',
-                'message': 'High Memory usage: {:.2f}%'.format(memory_usage),
-                'value': memory_usage,
-                'threshold': self.memory_threshold,
-                'timestamp': timestamp,
-                'severity': 'HIGH'
-            }
-            alerts.append(alert)
+            alerts.append(Alert('MEMORY', f'High Memory usage: {memory_usage:.2f}%', memory_usage, self.memory_threshold, timestamp, 'HIGH'))
 
         return alerts
 
@@ -1,5 +1,10 @@
-from flask import Flask, jsonify, request, render_template, session
+from flask import Flask, g, has_request_context, jsonify, request, render_template, session
+import atexit
+import logging
+import logging.handlers
+import orjson
 import os
+import queue
 import threading
 import time
 from datetime import datetime, timedelta
@@ -7,7 +12,7 @@ from datetime import datetime, timedelta
 # All models are imported 
 from src.log_analyzer import LogAnalyzer
 from src.auth import AuthManager
-from src.metrics import MetricsCollector
+from src.metrics import MetricsCollector, MetricRing
 from src.alerts import AlertManager
 from src.database import DatabaseManager
 
@@ -15,50 +20,92 @@ app = Flask(__name__)
 app.secret_key = os.urandom(24)  # the session security
 app.permanent_session_lifetime = timedelta(minutes=30)  # Session active till lasts 30 minutes
 
+# Build a JSON response with orjson, which is faster than jsonify and encodes datetimes itself
+def ojson(obj):
+    return app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+logger = logging.getLogger(__name__)
+
+# Send log records through a queue; a listener thread does the actual writing,
+# so the metrics thread never blocks on stdout/stderr
+def setup_logging():
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)  # Write out queued records on shutdown
+
 # Create objects for database, auth, metrics, alert handling
 db_manager = DatabaseManager()
-auth_manager = AuthManager()
+auth_manager = AuthManager(app.secret_key)
 metrics_collector = MetricsCollector()
 alert_manager = AlertManager()
 
-# to Keep recent metrics in the list
-recent_metrics = []
-recent_metrics_lock = threading.Lock()
+# Requests borrow a pooled DB connection on first use and keep it in g until teardown
+def request_db_connection():
+    if not has_request_context():
+        return None  # background threads use their own long-lived connection
+    if 'db_conn' not in g:
+        g.db_conn = db_manager.acquire_connection()
+    return g.db_conn
+
+db_manager.scoped_connection = request_db_connection
+
+# Hand the request's DB connection back to the pool instead of closing it
+@app.teardown_request
+def release_request_connection(exception):
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        db_manager.release_connection(conn)
+
 # Selecting Max number of metrics to hold in memory
 MAX_METRICS_STORAGE = 100
+# How many of the latest metrics the summary averages over
+SUMMARY_WINDOW = 10
+# to Keep recent metrics; the ring overwrites the oldest one when full
+recent_metrics = MetricRing(MAX_METRICS_STORAGE, SUMMARY_WINDOW)
+# Seconds between metric collections, and the wait after a failed one
+COLLECTION_INTERVAL = 5
+ERROR_RETRY_DELAY = 10
 # Event to stop the metric collection loop properly 
 stop_event = threading.Event()
 
-# collect CPU and memory usage again and again
+# collect CPU and memory usage once and store any alerts
+def collect_metrics_once():
+    cpu = metrics_collector.get_cpu_usage()
+    memory = metrics_collector.get_memory_usage()
+    now = datetime.now()
+
+    #  new metric
+    recent_metrics.append(now, cpu, memory)
+
+    # Check if any alerts 
+    alerts = alert_manager.check_thresholds(cpu, memory, now)
+    db_manager.store_alerts_batch(alerts)
+    for alert in alerts:
+        logger.info("ALERT: %s", alert)
+
+# collect metrics on a fixed schedule until stopped; rounds missed while
+# busy are skipped (coalesced) instead of being run back to back
 def collect_metrics_continuously():
-    while not stop_event.is_set():
+    next_run = time.monotonic()
+    while True:
         try:
-            cpu = metrics_collector.get_cpu_usage()
-            memory = metrics_collector.get_memory_usage()
-            now = datetime.now()
-
-            metric = {
-                'timestamp': now,
-                'cpu_usage': cpu,
-                'memory_usage': memory
-            }
-
-            #  new metric
-            with recent_metrics_lock:
-                recent_metrics.append(metric)
-                if len(recent_metrics) > MAX_METRICS_STORAGE:
-                    recent_metrics.pop(0)
-
-            # Check if any alerts 
-            alerts = alert_manager.check_thresholds(cpu, memory, now)
-            for alert in alerts:
-                db_manager.store_alert(alert)
-                print("ALERT:", alert)
-
-            time.sleep(5)  # Sleep 5 seconds before checking next time
+            collect_metrics_once()
+            next_run += COLLECTION_INTERVAL
         except Exception as e:
-            print("Error during metric collection:", e)
-            time.sleep(10)  # Sleep 10 sec  if error happens
+            logger.exception("Error during metric collection: %s", e)
+            next_run = time.monotonic() + ERROR_RETRY_DELAY  # wait longer if error happens
+
+        current = time.monotonic()
+        if next_run < current:
+            missed = (current - next_run) // COLLECTION_INTERVAL + 1
+            next_run += missed * COLLECTION_INTERVAL
+        # Sleeps until the next run, waking early only to stop
+        if stop_event.wait(next_run - current):
+            break
 
 
 @app.errorhandler(Exception)
@@ -72,10 +119,10 @@ def analyze_logs():
     if not file or file.filename == '':
         return jsonify({'error': 'No log file provided'}), 400
     try:
-        content = file.read().decode('utf-8')
+        # Read the upload as raw byte lines; the analyzer only decodes what it reports
         analyzer = LogAnalyzer()
-        result = analyzer.analyze(content)
-        return jsonify(result)
+        result = analyzer.analyze_iter(file.stream)
+        return ojson(result)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -134,22 +181,16 @@ def get_summary():
         total_alerts = db_manager.get_total_alerts()
         breakdown = db_manager.get_alert_breakdown()
         recent_alerts = db_manager.get_recent_alerts(10)
-        avg_cpu = 0
-        avg_memory = 0
-        with recent_metrics_lock:
-            if recent_metrics:
-                last10 = recent_metrics[-10:]
-                avg_cpu = sum(m['cpu_usage'] for m in last10) / len(last10)
-                avg_memory = sum(m['memory_usage'] for m in last10) / len(last10)
+        avg_cpu, avg_memory = recent_metrics.averages()
         summary = {
             'total_alerts': total_alerts,
             'alert_breakdown': breakdown,
             'recent_alerts': recent_alerts,
             'average_metrics': {'cpu_usage': round(avg_cpu, 2), 'memory_usage': round(avg_memory, 2)},
             'current_thresholds': alert_manager.get_thresholds(),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': datetime.now()
         }
-        return jsonify(summary)
+        return ojson(summary)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -161,9 +202,8 @@ def dashboard():
 # Provide recent system metrics and alerts
 @app.route('/api/metrics')
 def get_metrics():
-    with recent_metrics_lock:
-        metrics = list(recent_metrics[-50:])
-    return jsonify({
+    metrics = recent_metrics.latest(50)
+    return ojson({
         'recent_metrics': metrics,
         'current_alerts': db_manager.get_recent_alerts(20)
     })
@@ -192,14 +232,11 @@ def update_thresholds():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Close resources on app shutdown
-@app.teardown_appcontext
-def close_resources(exception):
-    db_manager.close_connection()
-
 # Main app run
 if __name__ == '__main__':
+    setup_logging()
     db_manager.init_db()  # Create DB tables if not exist
+    atexit.register(db_manager.close_connection)  # Close DB connections on app shutdown
     try:
         auth_manager.register_user('admin', 'password123')  # Create default admin if missing
     except ValueError:
@@ -1,22 +1,34 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 import bcrypt
+import hashlib
+import hmac
 import secrets
+import time
+from itsdangerous import BadSignature, TimestampSigner
 
 class AuthManager:
-    def __init__(self):
+    def __init__(self, secret_key, bcrypt_rounds=12, login_cache_ttl=60):
         # Store users in a dictionary (not a real DB)
         self.users = {}  
-        # Store sessions: token -> user info and expiry time
-        self.sessions = {}  
-        # How long a session lasts
-        self.session_duration = timedelta(hours=24)
+        # Session tokens are signed "user_id.timestamp" strings, so no server-side session store is needed
+        # (own salt so these signatures can't be mixed up with Flask's session cookie, which uses the same key)
+        self.signer = TimestampSigner(secret_key, salt='codexray-session-token')
+        # How long a session lasts, in seconds
+        self.session_duration = 24 * 60 * 60
+        # bcrypt cost factor used when hashing new passwords
+        self.bcrypt_rounds = bcrypt_rounds
+        # Recent successful logins: username -> (HMAC of credentials, expiry), so repeat
+        # logins within the TTL skip bcrypt. The random pepper keeps the HMACs useless outside this process.
+        self._login_cache = {}
+        self._login_pepper = secrets.token_bytes(32)
+        self.login_cache_ttl = login_cache_ttl
 
     # Register a new user (hash password before storing)
     def register_user(self, username, password):
         if username in self.users:
             raise ValueError("Username already exists")
 
-        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        hashed = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.bcrypt_rounds))
         user_id = len(self.users) + 1
         self.users[username] = {
             'id': user_id,
@@ -32,30 +44,24 @@ class AuthManager:
             raise ValueError("Invalid username or password")
 
         user = self.users[username]
-        if not bcrypt.checkpw(password.encode('utf-8'), user['password_hash']):
-            raise ValueError("Invalid username or password")
-
-        token = secrets.token_hex(32)
-        expiry = datetime.now() + self.session_duration
+        now = time.monotonic()
+        login_key = hmac.new(self._login_pepper, (username + ':' + password).encode('utf-8'), hashlib.sha256).digest()
+        cached = self._login_cache.get(username)
+        if cached is None or now > cached[1] or not secrets.compare_digest(cached[0], login_key):
+            if not bcrypt.checkpw(password.encode('utf-8'), user['password_hash']):
+                raise ValueError("Invalid username or password")
+            self._login_cache[username] = (login_key, now + self.login_cache_ttl)
 
-        self.sessions[token] = {
-            'user_id': user['id'],
-            'username': username,
-            'expiry': expiry
-        }
+        return self.signer.sign(str(user['id'])).decode('utf-8')
 
-        return token
-
-    # Check if a session token is valid (exists and not expired)
+    # Check if a session token is valid (correctly signed and not expired)
     def validate_session(self, token):
-        if token not in self.sessions:
+        if not isinstance(token, str):
             return False
-
-        session = self.sessions[token]
-        if datetime.now() > session['expiry']:
-            del self.sessions[token]
+        try:
+            self.signer.unsign(token, max_age=self.session_duration)
+        except BadSignature:
             return False
-
         return True
 
     # Get user id for a given username
@@ -64,9 +70,3 @@ class AuthManager:
             return self.users[username]['id']
         return None
 
-    # Remove expired sessions from the session dictionary
-    def cleanup_expired_sessions(self):
-        now = datetime.now()
-        expired = [t for t, s in self.sessions.items() if now > s['expiry']]
-        for token in expired:
-            del self.sessions[token]
@@ -1,23 +1,193 @@
+import functools
+import logging
+import queue
 import sqlite3
+import threading
+import time
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
+# SQL used by the writer thread for each kind of queued row
+INSERT_SQL = {
+    'alert': '''
+        INSERT INTO alerts (type, message, value, threshold, severity, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''',
+}
+
+# Put on the queue to tell the writer thread to finish
+_STOP = object()
+
+
+class DatabaseWriterThread(threading.Thread):
+    # Most rows written in one transaction
+    MAX_BATCH = 64
+    # How long to wait for more rows before writing a partial batch (seconds)
+    MAX_WAIT = 0.01
+
+    def __init__(self, db_manager):
+        super().__init__(name='db-writer', daemon=True)
+        self.db_manager = db_manager
+        self.queue = queue.SimpleQueue()
+
+    # Take queued (kind, row) items and write them in batches until stopped
+    def run(self):
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.MAX_WAIT
+            while len(batch) < self.MAX_BATCH:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            try:
+                self.db_manager._write_batch(batch)
+            except Exception as e:
+                logger.exception("Error writing to database: %s", e)
+
+
+# Cache a read method's result for read_cache_ttl seconds, per set of arguments.
+# The cache is cleared whenever the writer thread commits new rows.
+def cached_query(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        now = time.monotonic()
+        # Hold on to this dict: if rows are written while we query, the cache is
+        # replaced with a new dict and our (possibly stale) result lands in the old one
+        cache = self._read_cache
+        entry = cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        value = method(self, *args, **kwargs)
+        cache[key] = (now + self.read_cache_ttl, value)
+        return value
+    return wrapper
+
+
 class DatabaseManager:
-    def __init__(self, db_path='codexray.db'):
-        # Save database file path and connect to SQLite DB
+    def __init__(self, db_path='codexray.db', read_cache_ttl=2, pool_size=8):
+        # Save database file path; long-lived threads open their own connection when they first need one
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.cursor = self.conn.cursor()
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        # Open connections lent to short-lived request threads (Werkzeug starts a thread per request)
+        self.pool_size = pool_size
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        # Optional hook returning the connection for the current context (app.py ties it to the request),
+        # or None to fall back to this thread's own connection
+        self.scoped_connection = None
+        # Background thread that does all inserts, started on first write
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        # Recent read results: key -> (expiry, value), see cached_query
+        self._read_cache = {}
+        self.read_cache_ttl = read_cache_ttl
 
-    # Close the database connection when done
+    # Open a new connection and remember it so close_connection can close it
+    def _open_connection(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        # synchronous is a per-connection setting (unlike journal_mode), so set it on every connection
+        conn.execute('PRAGMA synchronous=NORMAL')
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    # Return the current request's pooled connection, or this thread's own, opening it on first use
+    def _conn(self):
+        if self.scoped_connection is not None:
+            conn = self.scoped_connection()
+            if conn is not None:
+                return conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+        return conn
+
+    # Hand rows to the writer thread, starting it if needed
+    def _enqueue(self, items):
+        if not items:
+            return
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = DatabaseWriterThread(self)
+                self._writer.start()
+            writer = self._writer
+        for item in items:
+            writer.queue.put(item)
+
+    # Write a batch of queued rows in one transaction (runs on the writer thread)
+    def _write_batch(self, batch):
+        rows_by_kind = {}
+        for kind, row in batch:
+            rows_by_kind.setdefault(kind, []).append(row)
+        # The connection stays open; "with" only scopes the transaction (commit, or rollback on error)
+        with self._conn() as conn:
+            for kind, rows in rows_by_kind.items():
+                conn.executemany(INSERT_SQL[kind], rows)
+        self._invalidate_read_cache()
+
+    # Forget cached read results so the next reads see newly written rows
+    def _invalidate_read_cache(self):
+        self._read_cache = {}
+
+    # Stop the writer thread after it has written everything queued so far
+    def _stop_writer(self):
+        with self._writer_lock:
+            writer = self._writer
+            self._writer = None
+        if writer is not None:
+            writer.queue.put(_STOP)
+            writer.join()
+
+    # Borrow an open connection from the pool, opening a new one if none is free
+    def acquire_connection(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return self._open_connection()
+
+    # Return a borrowed connection to the pool; it is only closed when the pool is already full
+    def release_connection(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            with self._connections_lock:
+                if conn in self._connections:
+                    self._connections.remove(conn)
+            conn.close()
+
+    # Close every thread's database connection when done
     def close_connection(self):
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-            self.cursor = None
+        self._stop_writer()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        # Threads that keep running will open (or borrow) a fresh connection next time
+        self._local = threading.local()
+        self._pool = queue.LifoQueue(maxsize=self.pool_size)
 
     # Create the alerts table if it doesn't exist
     def init_db(self):
-        self.cursor.execute('''
+        conn = self._conn()
+        conn.execute('''
             CREATE TABLE IF NOT EXISTS alerts (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 type TEXT NOT NULL,
@@ -29,26 +199,37 @@ class DatabaseManager:
                 acknowledged BOOLEAN DEFAULT FALSE
             )
         ''')
-        self.conn.commit()
+        # Indexes so recent alerts are read in timestamp order and counted by type without full scans
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_ts ON alerts(timestamp DESC)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_type ON alerts(type)')
+        # WAL lets readers run alongside writes and groups commits together (stored in the DB file)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.commit()
 
-    # Add a new alert record to the DB
+    # Turn an Alert into a row for the alerts table
+    def _alert_row(self, alert):
+        return (alert.type, alert.message, alert.value, alert.threshold, alert.severity, alert.timestamp)
+
+    # Queue a new alert record; the writer thread adds it to the DB
     def store_alert(self, alert):
-        self.cursor.execute('''
-            INSERT INTO alerts (type, message, value, threshold, severity, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (alert['type'], alert['message'], alert['value'], alert['threshold'], alert['severity'], alert['timestamp']))
-        self.conn.commit()
+        self._enqueue([('alert', self._alert_row(alert))])
+
+    # Queue several alerts at once; they are written together in one transaction
+    def store_alerts_batch(self, alerts):
+        self._enqueue([('alert', self._alert_row(alert)) for alert in alerts])
 
     # Get total count of alerts stored
+    @cached_query
     def get_total_alerts(self):
-        self.cursor.execute('SELECT COUNT(*) FROM alerts')
-        count = self.cursor.fetchone()[0]
+        cursor = self._conn().execute('SELECT COUNT(*) FROM alerts')
+        count = cursor.fetchone()[0]
         return count
 
     # Get how many alerts of each type
+    @cached_query
     def get_alert_breakdown(self):
-        self.cursor.execute('SELECT type, COUNT(*) FROM alerts GROUP BY type')
-        rows = self.cursor.fetchall()
+        cursor = self._conn().execute('SELECT type, COUNT(*) FROM alerts GROUP BY type')
+        rows = cursor.fetchall()
         result = {}
         for row in rows:
             key = row[0]
@@ -57,14 +238,15 @@ class DatabaseManager:
         return result
 
     # Get recent alert records, default limit 10
+    @cached_query
     def get_recent_alerts(self, limit=10):
-        self.cursor.execute('''
+        cursor = self._conn().execute('''
             SELECT type, message, value, threshold, severity, timestamp
             FROM alerts
             ORDER BY timestamp DESC
             LIMIT ?
         ''', (limit,))
-        rows = self.cursor.fetchall()
+        rows = cursor.fetchall()
 
         alerts = []
         for row in rows:
@@ -1,40 +1,51 @@
 import re
 from collections import Counter
+from itertools import islice
+from operator import methodcaller
 from datetime import datetime
 
 class LogAnalyzer:
+    # Lines read per batch; each batch is matched and counted by C-level map/filter/Counter
+    BATCH_SIZE = 4096
+
     def __init__(self):
-        # Pattern to capture: word, date time, log level, message
-        self.log_pattern = re.compile(r'(\w+)\s+(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+-\s+(\w+):\s+(.+)')
+        # Pattern to capture: word, date time, log level, message.
+        # Matched against raw bytes with ASCII classes, so lines are never decoded up front
+        self.log_pattern = re.compile(rb'(\w+)\s+(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\s+-\s+(\w+):\s+(.+)', re.ASCII)
 
     # Analyze the log text and return counts and common messages
     def analyze(self, log_content):
-        lines = log_content.strip().split('\n')
-
-        levels = []
-        errors = []
-        warnings = []
-        infos = []
+        # The whole text is already in memory, so strip and split it in one go and
+        # tally every line at once; no per-line Python work or edge bookkeeping needed
+        lines = log_content.strip().encode('utf-8').split(b'\n')
+        raw_counts = Counter()
+        self._tally(raw_counts, lines)
+        return self._summarize(raw_counts, len(lines))
 
-        for line in lines:
-            match = self.log_pattern.match(line)
-            if match:
-                level = match.group(3).upper()
-                message = match.group(4)
+    # Same analysis over any iterable of byte lines (e.g. a binary file), without loading it all into memory
+    def analyze_iter(self, line_iter):
+        raw_counts, total_logs = self._count_pairs(line_iter)
+        return self._summarize(raw_counts, total_logs)
 
-                levels.append(level)
+    # Build the result from the raw (level, message) counts
+    def _summarize(self, raw_counts, total_logs):
+        # Decode and normalise once per distinct pair rather than once per line
+        pair_counts = Counter()
+        for (level, message), count in raw_counts.items():
+            level = level.decode('ascii').upper()
+            message = message.rstrip(b'\r').decode('utf-8', errors='replace')
+            pair_counts[(level, message)] += count
 
-                if level == 'ERROR':
-                    errors.append(message)
-                elif level == 'WARNING':
-                    warnings.append(message)
-                elif level == 'INFO':
-                    infos.append(message)
+        level_counts = Counter()
+        error_counts = Counter()
+        warning_counts = Counter()
+        info_counts = Counter()
+        per_level = {'ERROR': error_counts, 'WARNING': warning_counts, 'INFO': info_counts}
 
-        level_counts = Counter(levels)
-        error_counts = Counter(errors)
-        warning_counts = Counter(warnings)
-        info_counts = Counter(infos)
+        for (level, message), count in pair_counts.items():
+            level_counts[level] += count
+            if level in per_level:
+                per_level[level][message] = count
 
         top_errors = error_counts.most_common(5)
         top_warnings = warning_counts.most_common(5)
@@ -42,13 +53,74 @@ class LogAnalyzer:
 
         return {
             'log_level_counts': dict(level_counts),
-            'total_logs': len(lines),
+            'total_logs': total_logs,
             'top_errors': top_errors,
             'top_warnings': top_warnings,
             'top_info': top_infos,
             'analysis_timestamp': self._get_timestamp()
         }
 
+    # Count raw (level, message) pairs and return them with the number of log lines.
+    # Lines are treated as if the whole text had been stripped first (as analyze() always has):
+    # leading whitespace goes from the first line, trailing whitespace from the last, and blank
+    # lines only count when they sit between log lines. Only the lines at the edges of each
+    # batch are looked at in Python; the rest go straight through the C-level tally.
+    def _count_pairs(self, line_iter):
+        line_iter = iter(line_iter)
+        raw_counts = Counter()
+        seen = 0        # lines read so far
+        first = None    # position of the first non-blank line
+        last = None     # position of the last non-blank line
+        pending = None  # that last line, held back until we know whether it is the final one
+
+        while True:
+            batch = list(islice(line_iter, self.BATCH_SIZE))
+            if not batch:
+                break
+            end = len(batch) - 1
+            while end >= 0 and self._is_blank(batch[end]):
+                end -= 1
+            if end >= 0:
+                start = 0
+                if first is None:
+                    while self._is_blank(batch[start]):
+                        start += 1
+                    first = seen + start
+                    batch[start] = self._strip_start(batch[start])
+                if pending is not None:
+                    self._tally(raw_counts, (pending,))
+                self._tally(raw_counts, batch[start:end])
+                pending = batch[end]
+                last = seen + end
+            seen += len(batch)
+
+        if pending is None:
+            # Stripped empty text still split into one (empty) line
+            return raw_counts, 1
+        self._tally(raw_counts, (self._strip_end(pending),))
+        return raw_counts, last - first + 1
+
+    # Add the (level, message) pair of every matching line to the counts
+    def _tally(self, raw_counts, lines):
+        matches = filter(None, map(self.log_pattern.match, lines))
+        raw_counts.update(map(methodcaller('group', 3, 4), matches))
+
+    # The edge checks below decode the line so they see all Unicode whitespace, as
+    # str.strip() did on the whole text; bytes.strip() would only see ASCII whitespace.
+    # They only run on a few lines per batch.
+
+    # True if the line is only whitespace
+    def _is_blank(self, line):
+        return not line.decode('utf-8', errors='replace').strip()
+
+    # Remove leading whitespace from the first log line
+    def _strip_start(self, line):
+        return line.decode('utf-8', errors='replace').lstrip().encode('utf-8')
+
+    # Remove trailing whitespace from the last log line
+    def _strip_end(self, line):
+        return line.decode('utf-8', errors='replace').rstrip().encode('utf-8')
+
     # Get current timestamp in ISO format string
     def _get_timestamp(self):
         return datetime.now().isoformat()
@@ -1,10 +1,27 @@
+import math
 import psutil
+from array import array
+from dataclasses import dataclass
 from datetime import datetime
 
+
+@dataclass
+class Metric:
+    """One CPU/memory sample; serializes to the same JSON object as the old dict"""
+    __slots__ = ('timestamp', 'cpu_usage', 'memory_usage')
+    timestamp: datetime
+    cpu_usage: float
+    memory_usage: float
+
+
 class MetricsCollector:
+    def __init__(self):
+        # Prime psutil's CPU counter so later non-blocking calls have a baseline
+        psutil.cpu_percent(interval=None)
+
     def get_cpu_usage(self) -> float:
-        """Get current CPU usage percentage"""
-        return psutil.cpu_percent(interval=1)
+        """Get CPU usage percentage since the previous call (non-blocking)"""
+        return psutil.cpu_percent(interval=None)
     
     def get_memory_usage(self) -> float:
         """Get current memory usage percentage"""
@@ -23,4 +40,48 @@ class MetricsCollector:
             'memory_usage': self.get_memory_usage(),
             'disk_usage': self.get_disk_usage(),
             'timestamp': datetime.now()
-        }
\ No newline at end of file
+        }
+
+class MetricRing:
+    """Fixed-size store of recent metrics kept as parallel arrays of doubles"""
+
+    def __init__(self, size: int, summary_window: int = 10):
+        self.size = size
+        self.timestamps = array('d', [0.0] * size)
+        self.cpu = array('d', [0.0] * size)
+        self.memory = array('d', [0.0] * size)
+        self.next_index = 0
+        self.count = 0
+        # How many of the newest metrics averages() covers
+        self.summary_window = min(summary_window, size)
+
+    def append(self, timestamp: datetime, cpu: float, memory: float) -> None:
+        """Store a metric, overwriting the oldest one when full"""
+        i = self.next_index
+        self.timestamps[i] = timestamp.timestamp()
+        self.cpu[i] = cpu
+        self.memory[i] = memory
+        self.next_index = (i + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def latest(self, n: int) -> list:
+        """Get the newest n metrics, oldest first"""
+        end = self.next_index
+        count = min(n, self.count)
+        metrics = []
+        for k in range(end - count, end):
+            i = k % self.size
+            metrics.append(Metric(datetime.fromtimestamp(self.timestamps[i]), self.cpu[i], self.memory[i]))
+        return metrics
+
+    def averages(self) -> tuple:
+        """Get average CPU and memory usage over the summary window"""
+        end = self.next_index
+        window_count = min(self.summary_window, self.count)
+        if not window_count:
+            return 0.0, 0.0
+        # Exact sum over the few window slots, so no rounding error builds up over time
+        slots = [k % self.size for k in range(end - window_count, end)]
+        cpu_sum = math.fsum(self.cpu[i] for i in slots)
+        memory_sum = math.fsum(self.memory[i] for i in slots)
+        return cpu_sum / window_count, memory_sum / window_count
\ No newline at end of file